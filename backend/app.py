@@ -1,12 +1,25 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, make_response, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from cachetools import TTLCache
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+import orjson
 import sqlite3
+import queue
 import os
 import jwt
 import re
+import time
+import base64
+import functools
+import hashlib
+import hmac
+import threading
+import traceback
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
@@ -15,6 +28,30 @@ load_dotenv()
 
 app = Flask(__name__)
 
+# Serialize jsonify() responses and parse request.get_json() bodies with orjson
+class ORJSONProvider(JSONProvider):
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Same argument rules as jsonify(): one positional value, several (sent as a list),
+        # or keyword arguments (sent as an object)
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        if len(args) == 1:
+            obj = args[0]
+        else:
+            obj = args or kwargs or None
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype="application/json")
+
+app.json = ORJSONProvider(app)
+
 # Get configuration from environment variables with fallbacks
 SECRET_KEY = os.getenv('SECRET_KEY', os.urandom(32).hex())
 # Comma-separated list of allowed frontend origins.
@@ -23,26 +60,58 @@ ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')
 
 app.config['SECRET_KEY'] = SECRET_KEY
 
-# Configure CORS
-_allow_all_origins = any(o.strip() == '*' for o in ALLOWED_ORIGINS)
-CORS(
-    app,
-    origins="*" if _allow_all_origins else [o.strip() for o in ALLOWED_ORIGINS if o.strip()],
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
-    # We don't use cookies for auth; disabling credentials avoids invalid "*" + credentials combinations.
-    supports_credentials=False,
-)
+# argon2id hasher for new passwords. Raise the costs as CPUs get faster (ARGON2_TIME_COST
+# iterations, ARGON2_MEMORY_COST in KiB); existing hashes are upgraded on the next
+# successful login via check_needs_rehash().
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 3))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 64 * 1024))
+PASSWORD_HASHER = PasswordHasher(time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST, parallelism=1)
 
-# Configure rate limiting
-limiter = Limiter(
-    app=app,
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
-)
+# Under gevent workers (see wsgi.py) a password hash would block the hub and stall every
+# other greenlet, so run it on gevent's native thread pool (argon2 and Werkzeug's scrypt
+# release the GIL while hashing). The dev server calls it inline.
+# The pool is per worker process, so split the cores across the WEB_CONCURRENCY workers
+# (see gunicorn.conf.py) rather than giving each worker one thread per CPU; KDF_THREADS
+# overrides the per-worker size.
+_cpus = os.cpu_count() or 4
+KDF_THREADS = int(os.getenv('KDF_THREADS') or max(1, _cpus // int(os.getenv('WEB_CONCURRENCY') or _cpus)))
+try:
+    from gevent import monkey as _gevent_monkey
+    from gevent.threadpool import ThreadPool
+    if _gevent_monkey.is_module_patched('threading'):
+        _kdf_pool = ThreadPool(maxsize=KDF_THREADS)
+    else:
+        _kdf_pool = None
+except ImportError:
+    _kdf_pool = None
 
-# Ensure CORS headers are added to all responses (flask-cors handles this, but keep for compatibility)
+def run_kdf(func, *args, **kwargs):
+    if _kdf_pool is None:
+        return func(*args, **kwargs)
+    return _kdf_pool.apply(func, args, kwargs)
+
+def hash_password(password):
+    return PASSWORD_HASHER.hash(password)
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash, returning (valid, needs_rehash)."""
+    if password_hash.startswith('$argon2'):
+        try:
+            PASSWORD_HASHER.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False, False
+        return True, PASSWORD_HASHER.check_needs_rehash(password_hash)
+    # Older Werkzeug pbkdf2/scrypt hashes are still accepted and upgraded to argon2id on success
+    valid = check_password_hash(password_hash, password)
+    return valid, valid
+
+# Configure CORS
+# Parsed once at startup; the response hooks only do set lookups
+_ALLOWED_ORIGINS_SET = frozenset(o.strip() for o in ALLOWED_ORIGINS if o.strip())
+_allow_all_origins = '*' in _ALLOWED_ORIGINS_SET
+
+# Ensure CORS headers are added to all responses (flask-cors handles this, but keep for compatibility).
+# Registered before CORS(app) so it runs after flask-cors and only fills in what it left unset.
 @app.after_request
 def after_request(response):
     # CORS is mostly handled by flask-cors, but ensure preflight responses include
@@ -52,7 +121,7 @@ def after_request(response):
     # Allow origin
     if _allow_all_origins:
         response.headers.setdefault('Access-Control-Allow-Origin', '*')
-    elif origin and origin in [o.strip() for o in ALLOWED_ORIGINS]:
+    elif origin and origin in _ALLOWED_ORIGINS_SET:
         response.headers.setdefault('Access-Control-Allow-Origin', origin)
 
     # Handle OPTIONS preflight
@@ -67,118 +136,326 @@ def after_request(response):
         else:
             response.headers.setdefault('Access-Control-Allow-Headers', 'Content-Type, Authorization')
 
-        # Cache preflight for a day (dev friendly)
-        response.headers.setdefault('Access-Control-Max-Age', '86400')
-
     return response
 
+CORS(
+    app,
+    origins="*" if _allow_all_origins else sorted(_ALLOWED_ORIGINS_SET),
+    # Answer "*" rather than echoing the request Origin when all origins are allowed
+    send_wildcard=_allow_all_origins,
+    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    # Let browsers cache preflights for a day so repeat calls skip the OPTIONS round-trip
+    max_age=86400,
+    # We don't use cookies for auth; disabling credentials avoids invalid "*" + credentials combinations.
+    supports_credentials=False,
+)
+
+# Configure rate limiting
+# The default in-memory storage is per process: under gunicorn every worker keeps its own
+# counters, so each limit below is effectively multiplied by the worker count. Point
+# RATELIMIT_STORAGE_URI at a shared backend (e.g. redis://localhost:6379) to enforce them exactly.
+limiter = Limiter(
+    app=app,
+    key_func=get_remote_address,
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=os.getenv('RATELIMIT_STORAGE_URI', "memory://")
+)
+
 # Global error handler to ensure CORS headers on errors
 @app.errorhandler(Exception)
 def handle_error(e):
-    from flask import make_response
-    import traceback
     print(f"Error: {str(e)}")
     print(traceback.format_exc())
+    # The exception is handled here, so teardown sees exc=None; undo the failed request's
+    # writes now rather than letting release_db() commit them
+    db = g.get('db')
+    if db is not None and db.in_transaction:
+        db.rollback()
     response = make_response(jsonify({"error": "Internal server error"}), 500)
     origin = request.headers.get('Origin')
     if _allow_all_origins:
         response.headers.add('Access-Control-Allow-Origin', '*')
-    elif origin and origin in [o.strip() for o in ALLOWED_ORIGINS]:
+    elif origin and origin in _ALLOWED_ORIGINS_SET:
         response.headers.add('Access-Control-Allow-Origin', origin)
     return response
 
-# Authentication middleware
+# Cache of successfully verified tokens: sha256(token) prefix -> (user_id, username, exp).
+# Saves re-running the HMAC signature check on every request made with the same token.
+# Entries live at most 30s and are never served past the token's own expiry.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+_token_cache_lock = threading.Lock()
+
+def _b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+# HMAC-SHA256 keyed with app.config['SECRET_KEY'], the same key login() signs with.
+# The ipad/opad key setup is done once per key; each verification works on a .copy()
+# of this state. Rebuilt (and the token cache dropped) if the configured key changes.
+_jwt_mac_state = (None, None)
+
+def _jwt_mac():
+    global _jwt_mac_state
+    secret = app.config['SECRET_KEY']
+    key, mac = _jwt_mac_state
+    if key != secret:
+        mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        with _token_cache_lock:
+            _token_cache.clear()
+        _jwt_mac_state = (secret, mac)
+    return mac
+
+def _fast_decode(token, base_mac):
+    """Verify an HS256 token and return its claims, raising the same errors as jwt.decode."""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split('.')
+        header = orjson.loads(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+    except ValueError as e:  # covers bad segment count, base64 and JSON errors
+        raise jwt.DecodeError("Invalid token") from e
+    if not isinstance(header, dict) or header.get('alg') != 'HS256':
+        raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+    
+    mac = base_mac.copy()
+    mac.update(f"{header_b64}.{payload_b64}".encode())
+    if not hmac.compare_digest(mac.digest(), signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    
+    try:
+        payload = orjson.loads(_b64url_decode(payload_b64))
+    except ValueError as e:
+        raise jwt.DecodeError("Invalid payload") from e
+    if not isinstance(payload, dict) or not isinstance(payload.get('exp'), (int, float)):
+        raise jwt.MissingRequiredClaimError('exp')
+    if payload['exp'] <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return payload
+
+def decode_token(token):
+    """Return (user_id, username) for a valid token, raising jwt errors otherwise."""
+    # Resolve the MAC first so a changed key has already dropped stale cache entries
+    base_mac = _jwt_mac()
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached and time.time() < cached[2]:
+        return cached[0], cached[1]
+
+    # Failed verifications raise before reaching the cache, so they are never stored
+    data = _fast_decode(token, base_mac)
+    with _token_cache_lock:
+        _token_cache[key] = (data['user_id'], data['username'], data['exp'])
+    return data['user_id'], data['username']
+
+# Endpoints that require a valid token; registered by @verify_token
+_protected_endpoints = set()
+
+# "Bearer <jwt>" with only base64url segments, so malformed headers are rejected before any decoding
+_BEARER_RE = re.compile(r'Bearer ([A-Za-z0-9_\-.]+)')
+
+def _auth_error(message):
+    response = make_response(jsonify({"error": message}), 401)
+    if _allow_all_origins:
+        response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
+# Authentication middleware: decode the bearer token once per request and stash the
+# user on flask.g, so anything else that needs the user never decodes it again
+@app.before_request
+def authenticate():
+    # Preflights never carry credentials; let flask-cors answer them
+    if request.method == 'OPTIONS' or request.endpoint not in _protected_endpoints:
+        return None
+    
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return _auth_error("Authentication required")
+    
+    match = _BEARER_RE.fullmatch(auth_header)
+    if not match:
+        return _auth_error("Invalid token format")
+    
+    try:
+        g.user_id, g.username = decode_token(match.group(1))
+    except jwt.ExpiredSignatureError:
+        return _auth_error("Token expired")
+    except jwt.InvalidTokenError:
+        return _auth_error("Invalid token")
+    
+    return None
+
 def verify_token(f):
-    from flask import make_response
+    _protected_endpoints.add(f.__name__)
+    @functools.wraps(f)
     def wrapper(*args, **kwargs):
-        token = None
-        auth_header = request.headers.get('Authorization')
-        
-        if auth_header:
-            try:
-                token = auth_header.split(' ')[1]  # Bearer <token>
-            except:
-                response = make_response(jsonify({"error": "Invalid token format"}), 401)
-                if _allow_all_origins:
-                    response.headers.add('Access-Control-Allow-Origin', '*')
-                return response
-        
-        if not token:
-            response = make_response(jsonify({"error": "Authentication required"}), 401)
-            if _allow_all_origins:
-                response.headers.add('Access-Control-Allow-Origin', '*')
-            return response
-        
-        try:
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            request.current_user_id = data['user_id']
-            request.current_username = data['username']
-        except jwt.ExpiredSignatureError:
-            response = make_response(jsonify({"error": "Token expired"}), 401)
-            if _allow_all_origins:
-                response.headers.add('Access-Control-Allow-Origin', '*')
-            return response
-        except jwt.InvalidTokenError:
-            response = make_response(jsonify({"error": "Invalid token"}), 401)
-            if _allow_all_origins:
-                response.headers.add('Access-Control-Allow-Origin', '*')
-            return response
-        
+        # authenticate() has already rejected missing or invalid tokens
+        if g.get('user_id') is None:
+            return _auth_error("Authentication required")
         return f(*args, **kwargs)
-    wrapper.__name__ = f.__name__
     return wrapper
 
 # Database file
 DB_FILE = "tasks.db"
 
+# Bump when the schema or its migrations change; init_db() skips all DDL once a
+# database file is already at this version. Nothing that has to be refreshed over the
+# database's life belongs behind this gate (planner stats are kept by release_db()).
+SCHEMA_VERSION = 1
+
 # Initialize database
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    
+    # Switch to WAL up front (the journal mode can't change inside a transaction)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        conn.close()
+        return
+    
     cursor = conn.cursor()
     
-    # Create users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create tasks table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            text TEXT NOT NULL,
-            completed INTEGER DEFAULT 0,
-            pomodoroCount INTEGER DEFAULT 0,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    """)
-    
-    # Migration: Add user_id column if it doesn't exist (for existing databases)
-    try:
-        cursor.execute("SELECT user_id FROM tasks LIMIT 1")
-    except sqlite3.OperationalError:
-        # Column doesn't exist, add it
-        print("Migrating database: Adding user_id column to tasks table...")
-        cursor.execute("ALTER TABLE tasks ADD COLUMN user_id INTEGER")
-        # Set existing tasks to user_id = 1 (or NULL if you prefer)
-        cursor.execute("UPDATE tasks SET user_id = 1 WHERE user_id IS NULL")
-        print("Migration complete!")
-    
-    conn.commit()
+    # Apply the schema and migrations in a single transaction
+    with conn:
+        cursor.execute("BEGIN")
+        
+        # Create users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Create tasks table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                text TEXT NOT NULL,
+                completed INTEGER DEFAULT 0,
+                pomodoroCount INTEGER DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+        """)
+        
+        # Migration: Add user_id column if it doesn't exist (for existing databases)
+        try:
+            cursor.execute("SELECT user_id FROM tasks LIMIT 1")
+        except sqlite3.OperationalError:
+            # Column doesn't exist, add it
+            print("Migrating database: Adding user_id column to tasks table...")
+            cursor.execute("ALTER TABLE tasks ADD COLUMN user_id INTEGER")
+            # Set existing tasks to user_id = 1 (or NULL if you prefer)
+            cursor.execute("UPDATE tasks SET user_id = 1 WHERE user_id IS NULL")
+            print("Migration complete!")
+        
+        # Index the per-user task lookups (get_tasks, delete_task, increment_pomodoro).
+        # users.username/email already get implicit indexes from their UNIQUE constraints.
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks(user_id, id)")
+        
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
     conn.close()
 
-# Get database connection
-def get_db():
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+# Connection tuning applied once when a thread opens its connection.
+# WAL lets readers (get_tasks) run alongside the pomodoro writers, and synchronous=NORMAL
+# drops the per-commit fsync that WAL makes unnecessary. cache_size is in KiB (64 MiB).
+DB_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-65536;
+    PRAGMA foreign_keys=ON;
+"""
+
+# Column order of the rows returned below; rows come back as plain tuples and are
+# zipped with these names only where a handler needs a dict
+TASK_COLUMNS = ("id", "user_id", "text", "completed", "pomodoroCount")
+USER_COLUMNS = ("id", "username", "email")
+
+# SQL used by the request handlers. Kept as module constants so every call passes the
+# identical string and hits the connection's prepared-statement cache.
+SQL_INSERT_USER = (
+    "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?) "
+    "ON CONFLICT DO NOTHING RETURNING id"
+)
+SQL_USERNAME_TAKEN = "SELECT MAX(username = ?) FROM users WHERE username = ? OR email = ?"
+# Two single-index probes; LIMIT 1 skips the email probe when the username matches
+SQL_LOGIN_USER = (
+    "SELECT id, username, email, password_hash FROM users WHERE username = ? "
+    "UNION ALL "
+    "SELECT id, username, email, password_hash FROM users WHERE email = ? "
+    "LIMIT 1"
+)
+SQL_UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE id = ?"
+SQL_GET_USER = f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE id = ?"
+# Keyset pagination: an index range scan on (user_id, id) starting after the cursor
+SQL_GET_TASKS = (
+    f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks "
+    "WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?"
+)
+SQL_INSERT_TASK = "INSERT INTO tasks (user_id, text, completed, pomodoroCount) VALUES (?, ?, ?, ?)"
+SQL_DELETE_TASK = "DELETE FROM tasks WHERE id = ? AND user_id = ? RETURNING id"
+SQL_INC_POMODORO = (
+    "UPDATE tasks SET pomodoroCount = pomodoroCount + 1 WHERE id = ? AND user_id = ? "
+    f"RETURNING {', '.join(TASK_COLUMNS)}"
+)
+
+# Idle connections shared by every request, reused most-recently-returned first so the
+# warm ones (page cache, prepared statements) are picked up again. A plain queue works
+# for both dev-server threads and gevent greenlets, which threading.local would not.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 16))
+_db_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def _connect():
+    # Autocommit mode: each write statement commits on its own
+    conn = sqlite3.connect(
+        DB_FILE, check_same_thread=False, isolation_level=None, cached_statements=512
+    )
+    conn.executescript(DB_PRAGMAS)
     return conn
 
+# Planner statistics are refreshed with PRAGMA optimize, which only re-analyzes tables the
+# connection has queried whose stats are missing or stale. Pooled connections live for the
+# whole process, so run it on a released connection at most once an hour, and on close.
+OPTIMIZE_INTERVAL = 3600
+_next_optimize = time.monotonic() + OPTIMIZE_INTERVAL
+
+# Get database connection: check one out of the pool, opening a new one if it is empty
+def get_db():
+    if 'db' not in g:
+        try:
+            g.db = _db_pool.get_nowait()
+        except queue.Empty:
+            g.db = _connect()
+    return g.db
+
+# Return the connection to the pool at the end of the request, settling any transaction
+# a handler left open: commit on success, roll back if the request failed
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop('db', None)
+    if conn is None:
+        return
+    if conn.in_transaction:
+        if exc is None:
+            conn.commit()
+        else:
+            conn.rollback()
+    global _next_optimize
+    if time.monotonic() >= _next_optimize:
+        _next_optimize = time.monotonic() + OPTIMIZE_INTERVAL
+        conn.execute("PRAGMA optimize")
+    try:
+        _db_pool.put_nowait(conn)
+    except queue.Full:
+        conn.execute("PRAGMA optimize")
+        conn.close()
+
 # Initialize database on startup
 init_db()
 
@@ -188,20 +465,22 @@ def hello():
     return jsonify({"message": "Backend is running"})
 
 # Input validation helpers
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def validate_username(username):
     if not username or len(username.strip()) < 3:
         return False, "Username must be at least 3 characters"
     if len(username) > 50:
         return False, "Username must be less than 50 characters"
-    if not re.match(r'^[a-zA-Z0-9_]+$', username):
+    if not _USERNAME_RE.match(username):
         return False, "Username can only contain letters, numbers, and underscores"
     return True, None
 
 def validate_email(email):
     if not email:
         return False, "Email is required"
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
+    if not _EMAIL_RE.match(email):
         return False, "Invalid email format"
     return True, None
 
@@ -240,32 +519,19 @@ def register():
     if not valid:
         return jsonify({"error": error}), 400
     
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Check if username already exists
-    cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-    if cursor.fetchone():
-        conn.close()
-        return jsonify({"error": "Username already exists"}), 400
-    
-    # Check if email already exists
-    cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-    if cursor.fetchone():
-        conn.close()
-        return jsonify({"error": "Email already exists"}), 400
-    
     # Hash password
-    password_hash = generate_password_hash(password)
+    password_hash = run_kdf(hash_password, password)
     
-    # Insert new user
-    cursor.execute(
-        "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
-        (username, email, password_hash)
-    )
-    conn.commit()
-    user_id = cursor.lastrowid
-    conn.close()
+    # Insert new user; the UNIQUE constraints reject taken usernames/emails atomically
+    conn = get_db()
+    inserted = conn.execute(SQL_INSERT_USER, (username, email, password_hash)).fetchone()
+    if inserted is None:
+        # Only look up which field collided once the insert has been skipped
+        username_taken = conn.execute(SQL_USERNAME_TAKEN, (username, username, email)).fetchone()[0]
+        if username_taken == 0:
+            return jsonify({"error": "Email already exists"}), 400
+        return jsonify({"error": "Username already exists"}), 400
+    user_id = inserted[0]
     
     return jsonify({
         "message": "User created successfully",
@@ -276,9 +542,23 @@ def register():
         }
     }), 201
 
+# Recently verified logins: HMAC(secret, "login:password") -> (user_id, username, email).
+# Repeat logins within 60s skip the password KDF. The key is an HMAC under the server
+# secret, so the cache never holds anything that could be cracked offline.
+# Clear it if a password-change endpoint is ever added.
+_login_cache = TTLCache(maxsize=5000, ttl=60)
+_login_cache_lock = threading.Lock()
+
+# Rate-limit key for login attempts against a single account from a single address
+def login_rate_key():
+    data = request.get_json(silent=True)
+    username = data.get("username") if isinstance(data, dict) else None
+    return f"{get_remote_address()}:{str(username or '').strip().lower()}"
+
 # User Login
 @app.route("/api/auth/login", methods=["POST"])
 @limiter.limit("10 per minute")
+@limiter.limit("5 per minute", key_func=login_rate_key)
 def login():
     data = request.get_json()
     
@@ -291,100 +571,118 @@ def login():
     if not username_or_email or not password:
         return jsonify({"error": "Username and password are required"}), 400
     
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Find user by username or email
-    cursor.execute(
-        "SELECT * FROM users WHERE username = ? OR email = ?",
-        (username_or_email, username_or_email.lower())
-    )
-    user = cursor.fetchone()
-    
-    if not user:
-        conn.close()
+    # No account can have a password outside the registration bounds, so reject those
+    # before spending a KDF run on them (also stops oversized inputs burning CPU)
+    if not 6 <= len(password) <= 128:
         return jsonify({"error": "Invalid username or password"}), 401
     
-    # Verify password
-    if not check_password_hash(user["password_hash"], password):
-        conn.close()
-        return jsonify({"error": "Invalid username or password"}), 401
+    cache_key = hmac.new(
+        app.config['SECRET_KEY'].encode(),
+        f"{username_or_email}:{password}".encode(),
+        hashlib.sha256
+    ).digest()
+    with _login_cache_lock:
+        cached_user = _login_cache.get(cache_key)
+    
+    if cached_user:
+        user_id, username, email = cached_user
+    else:
+        conn = get_db()
+        
+        # Find user by username or email
+        user = conn.execute(SQL_LOGIN_USER, (username_or_email, username_or_email.lower())).fetchone()
+        
+        if not user:
+            return jsonify({"error": "Invalid username or password"}), 401
+        
+        user_id, username, email, password_hash = user
+        
+        # Verify password
+        valid, needs_rehash = run_kdf(verify_password, password_hash, password)
+        if not valid:
+            return jsonify({"error": "Invalid username or password"}), 401
+        
+        # Upgrade legacy or outdated-cost hashes while we have the plaintext
+        if needs_rehash:
+            conn.execute(SQL_UPDATE_PASSWORD_HASH, (run_kdf(hash_password, password), user_id))
+        
+        with _login_cache_lock:
+            _login_cache[cache_key] = (user_id, username, email)
     
     # Generate JWT token (expires in 7 days)
     token = jwt.encode({
-        'user_id': user["id"],
-        'username': user["username"],
+        'user_id': user_id,
+        'username': username,
         'exp': datetime.utcnow() + timedelta(days=7)
-    }, app.config['SECRET_KEY'], algorithm='HS256')
-    
-    # Ensure token is a string (PyJWT 2.x returns string, but be explicit)
-    if isinstance(token, bytes):
-        token = token.decode('utf-8')
-    
-    conn.close()
+    }, app.config['SECRET_KEY'], algorithm='HS256')  # PyJWT 2.x returns str
     
     return jsonify({
         "message": "Login successful",
-        "token": str(token),
+        "token": token,
         "user": {
-            "id": user["id"],
-            "username": user["username"],
-            "email": user["email"]
+            "id": user_id,
+            "username": username,
+            "email": email
         }
     }), 200
 
+# Profile rows by user id, so /api/auth/me skips the users lookup for 60s.
+# Evict the entry from any endpoint that changes a user's username or email.
+_user_cache = TTLCache(maxsize=5000, ttl=60)
+_user_cache_lock = threading.Lock()
+
 # Get current user
 @app.route("/api/auth/me", methods=["GET"])
 @verify_token
 @limiter.limit("100 per hour")
 def get_current_user():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, username, email FROM users WHERE id = ?", (request.current_user_id,))
-    user = cursor.fetchone()
-    conn.close()
-    
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-    
-    return jsonify(dict(user)), 200
+    uid = g.user_id
+    with _user_cache_lock:
+        user = _user_cache.get(uid)
+    
+    if user is None:
+        user = get_db().execute(SQL_GET_USER, (uid,)).fetchone()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        with _user_cache_lock:
+            _user_cache[uid] = user
+    
+    return jsonify(dict(zip(USER_COLUMNS, user))), 200
 
-# Get all tasks (protected - user-specific)
+# Get tasks a page at a time (protected - user-specific)
+# Query params: limit (1-500, default 100) and after_id (the previous page's next_cursor)
+# A full list load costs one request per page, so this gets a higher limit than the
+# app-wide 50/hour default
 @app.route("/api/tasks", methods=["GET"])
 @verify_token
+@limiter.limit("600 per hour")
 def get_tasks():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tasks WHERE user_id = ?", (request.current_user_id,))
-    rows = cursor.fetchall()
-    conn.close()
-    
-    tasks = [dict(row) for row in rows]
-    return jsonify({"tasks": tasks})
+    uid = g.user_id
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 500)
+    after_id = request.args.get("after_id", 0, type=int)
+    rows = get_db().execute(SQL_GET_TASKS, (uid, after_id, limit)).fetchall()
+    
+    tasks = [dict(zip(TASK_COLUMNS, row)) for row in rows]
+    # A full page may have more after it; a short page is the last one
+    next_cursor = rows[-1][0] if len(rows) == limit else None
+    return jsonify({"tasks": tasks, "next_cursor": next_cursor})
 
 # Add a new task (protected - user-specific)
 @app.route("/api/tasks", methods=["POST"])
 @verify_token
 @limiter.limit("50 per hour")
 def add_task():
+    uid = g.user_id
     data = request.get_json()
     
     if not data or "text" not in data:
         return jsonify({"error": "Task text is required"}), 400
     
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO tasks (user_id, text, completed, pomodoroCount) VALUES (?, ?, ?, ?)",
-        (request.current_user_id, data["text"], 0, 0)
-    )
-    conn.commit()
-    task_id = cursor.lastrowid
-    conn.close()
+    task_id = get_db().execute(SQL_INSERT_TASK, (uid, data["text"], 0, 0)).lastrowid
     
     new_task = {
         "id": task_id,
-        "user_id": request.current_user_id,
+        "user_id": uid,
         "text": data["text"],
         "completed": 0,
         "pomodoroCount": 0
@@ -397,46 +695,28 @@ def add_task():
 @verify_token
 @limiter.limit("50 per hour")
 def delete_task(task_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tasks WHERE id = ? AND user_id = ?", (task_id, request.current_user_id))
-    task = cursor.fetchone()
+    uid = g.user_id
+    task = get_db().execute(SQL_DELETE_TASK, (task_id, uid)).fetchone()
     
     if not task:
-        conn.close()
         return jsonify({"error": "Task not found"}), 404
     
-    cursor.execute("DELETE FROM tasks WHERE id = ? AND user_id = ?", (task_id, request.current_user_id))
-    conn.commit()
-    conn.close()
-    
     return jsonify({"message": "Task deleted"}), 200
 
 # Update task pomodoro count (protected - user-specific)
+# Authenticated and naturally slow-paced (one per focus session), so skip the limiter bookkeeping
 @app.route("/api/tasks/<int:task_id>/pomodoro", methods=["POST"])
 @verify_token
-@limiter.limit("200 per hour")
+@limiter.exempt
 def increment_pomodoro(task_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tasks WHERE id = ? AND user_id = ?", (task_id, request.current_user_id))
-    task = cursor.fetchone()
+    uid = g.user_id
+    # Atomic increment in a single statement (SQLite >= 3.35 for RETURNING)
+    updated_task = get_db().execute(SQL_INC_POMODORO, (task_id, uid)).fetchone()
     
-    if not task:
-        conn.close()
+    if not updated_task:
         return jsonify({"error": "Task not found"}), 404
     
-    new_count = dict(task)["pomodoroCount"] + 1
-    cursor.execute(
-        "UPDATE tasks SET pomodoroCount = ? WHERE id = ? AND user_id = ?",
-        (new_count, task_id, request.current_user_id)
-    )
-    conn.commit()
-    cursor.execute("SELECT * FROM tasks WHERE id = ? AND user_id = ?", (task_id, request.current_user_id))
-    updated_task = cursor.fetchone()
-    conn.close()
-    
-    return jsonify(dict(updated_task)), 200
+    return jsonify(dict(zip(TASK_COLUMNS, updated_task))), 200
 
 if __name__ == "__main__":
     # Bind to all IPv4 interfaces to avoid Windows localhost/IPv6 resolution issues.
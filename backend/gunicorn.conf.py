@@ -0,0 +1,10 @@
+# gunicorn settings, picked up automatically when running `gunicorn wsgi:app` from backend/.
+# Processes parallelize the CPU-bound work (argon2 password hashing, JWT); gevent greenlets cover the SQLite I/O.
+import multiprocessing
+import os
+
+bind = "0.0.0.0:5000"
+worker_class = "gevent"
+# Also read by app.py to size each worker's password-hashing thread pool
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+worker_connections = 500
@@ -0,0 +1,18 @@
+# WSGI entry point for serving the API with gunicorn + gevent workers:
+#   gunicorn wsgi:app   (worker settings come from gunicorn.conf.py)
+# Run it from the backend directory so DB_FILE resolves to backend/tasks.db.
+
+# Patch the standard library before app.py imports sqlite3, jwt, threading, etc.
+from gevent import monkey
+monkey.patch_all()
+
+import os  # noqa: E402
+from dotenv import load_dotenv  # noqa: E402
+
+# Every worker imports app.py separately, so the random fallback key would differ per
+# worker and tokens issued by one would be rejected by the others
+load_dotenv()
+if not os.getenv('SECRET_KEY'):
+    raise RuntimeError("SECRET_KEY must be set (in the environment or backend/.env) when serving with gunicorn")
+
+from app import app  # noqa: E402
@@ -103,12 +103,19 @@ async function apiRequest(endpoint, options = {}) {
 export const API = {
     /**
      * Get all tasks from backend (with offline fallback)
+     * Follows the backend's next_cursor until every page has been fetched.
      * @returns {Promise<Array>} Array of tasks
      */
     async getTasks() {
         try {
-            const data = await apiRequest(CONFIG.API.ENDPOINTS.TASKS);
-            const tasks = data.tasks || [];
+            const tasks = [];
+            let afterId = null;
+            do {
+                const query = afterId ? `?after_id=${afterId}` : '';
+                const data = await apiRequest(`${CONFIG.API.ENDPOINTS.TASKS}${query}`);
+                tasks.push(...(data.tasks || []));
+                afterId = data.next_cursor;
+            } while (afterId);
             // Save to IndexedDB for offline access
             if (tasks.length > 0) {
                 await OfflineManager.init();
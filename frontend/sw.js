@@ -1,5 +1,5 @@
 // Service Worker for Offline Support
-const CACHE_NAME = 'productivity-app-v1';
+const CACHE_NAME = 'productivity-app-v2';
 const urlsToCache = [
     '/',
     '/index.html',